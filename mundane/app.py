@@ -4,6 +4,9 @@ To use this module, simply define a 'main' function that instantiates
 ArgparseApp(), sets up flags, and run.
 
 def main() -> int:
+    # Optional, but lets "--version" skip building the parser entirely.
+    app.quick_version('%(prog)s 1.2.3')
+
     my_app = app.ArgparseApp()
     my_app.register_global_flags([module1, module2, ..., moduleN])
     my_app.register_shared_flags([module1, module2, ..., moduleN])
@@ -18,21 +21,21 @@ if __name__ == '__main__':
     main()
 """
 
+from __future__ import annotations
+
 import argparse
 import functools
-import inspect
 import logging
 import os
-import resource
-import shutil
+import re
+import sys
 import textwrap
-import types
 import typing
 
-import humanize
-import platformdirs
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import types
 
-from mundane import log_mgr
+    import platformdirs
 
 
 class Error(Exception):
@@ -59,13 +62,61 @@ class _ArgparseKwargs(typing.TypedDict, total=False):
     prog: str
     usage: str | None
     epilog: str | None
-    formatter_class: 'argparse._FormatterClass'
+    formatter_class: argparse._FormatterClass
     fromfile_prefix_chars: str | None
     add_help: bool
     allow_abbrev: bool
     description: str | None
 
 
+# Everything in mundane logs to the root logger, which is what log_mgr
+# configures.
+_log = logging.getLogger()
+
+_COMMAND_PARSER_ARGS: typing.Final[dict[str, typing.Any]] = {
+    'formatter_class': argparse.RawDescriptionHelpFormatter,
+}
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_LINE_BREAK = re.compile(r'\s*\n\s*')
+
+
+@functools.lru_cache
+def _text_wrapper(width: int) -> textwrap.TextWrapper:
+    """A shared TextWrapper, so one is not built for every paragraph."""
+    return textwrap.TextWrapper(width=width)
+
+
+@functools.lru_cache(maxsize=1024)
+def _reflow_doc(doc: str | None, width: int) -> tuple[str, str]:
+    """Perform the actual split/reflow of a docstring.
+
+    Args:
+      doc: A cleaned up docstring, as from inspect.getdoc().
+      width: How wide the result should be.
+
+    Returns:
+      The reflowed summary and description.
+    """
+    if not doc:
+        return '', ''
+
+    wrapper = _text_wrapper(width)
+
+    # The first line is always its own paragraph, even without a blank line
+    # after it.
+    first, _, rest = doc.partition('\n')
+    paragraphs = [first, *_PARAGRAPH_BREAK.split(rest)]
+    description_parts = [
+        wrapper.fill(_LINE_BREAK.sub(' ', para.strip()))
+        for para in paragraphs
+        if para.strip()
+    ]
+
+    summary = description_parts[0] if description_parts else ''
+    return summary, '\n\n'.join(description_parts)
+
+
 class Docstring:
     """A reflowed docstring.
 
@@ -75,6 +126,8 @@ class Docstring:
     The instance has two properties: summary and description.
     """
 
+    __slots__ = ('_doc', '_width')
+
     def __init__(self, obj: typing.Any, width: int):
         """Reflow the docstring.
 
@@ -82,56 +135,22 @@ class Docstring:
           obj: Any object with a docstring (module, function, etc).
           width: How wide the result should be.
         """
+        # inspect drags in ast, dis and tokenize, so only pay for it when a
+        # docstring is actually needed.
+        import inspect  # pylint: disable=import-outside-toplevel
+
         self._doc = inspect.getdoc(obj)
         self._width = width
-        self._summary = None
-        self._description = None
 
     @property
     def summary(self):
         """The first line of the docstring, reflowed."""
-        if self._summary is None:
-            self._process()
-        return self._summary
+        return _reflow_doc(self._doc, self._width)[0]
 
     @property
     def description(self):
         """Full docstring, reflowed."""
-        if self._description is None:
-            self._process()
-        return self._description
-
-    def _process(self):
-        """Perform the actual split/reflow of the docstring."""
-        self._summary = ''
-        self._description = ''
-        description_parts = list()
-
-        def paragraphs(content):
-            split = content.split('\n')
-            yield textwrap.fill(split.pop(0).strip(), width=self._width)
-
-            current = list()
-            for item in split:
-                stripped = item.strip()
-                if stripped:
-                    current.append(stripped)
-                else:
-                    if current:
-                        yield textwrap.fill(
-                            ' '.join(current), width=self._width
-                        )
-                        current.clear()
-            if current:
-                yield textwrap.fill(' '.join(current), width=self._width)
-
-        if self._doc:
-            for para in paragraphs(self._doc):
-                if not self._summary:
-                    self._summary = para
-                description_parts.append(para)
-
-        self._description = '\n\n'.join(description_parts)
+        return _reflow_doc(self._doc, self._width)[1]
 
 
 CommandFunc: typing.TypeAlias = typing.Callable[[argparse.Namespace], int]
@@ -148,6 +167,69 @@ def _usage(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
     return os.EX_USAGE
 
 
+def quick_version(version: str, argv: list[str] | None = None):
+    """Display the version and exit, iff that is all that was asked for.
+
+    Building an ArgparseApp, and importing all of the modules that register
+    flags and commands with it, is wasted work if the user only wants the
+    version.  Call this first thing in main() to avoid it.
+
+    def main() -> int:
+        app.quick_version('%(prog)s 1.2.3')
+
+        my_app = app.ArgparseApp()
+        ...
+
+    Only a lone -V or --version is handled here.  Anything else is left for
+    the full parser, so it is still a good idea to register a regular
+    'version' action as well.
+
+    Args:
+      version: The string to display.  As with argparse's 'version' action,
+        '%(prog)s' will be replaced with the program name.
+      argv: The arguments to inspect.  Defaults to sys.argv[1:].
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if len(argv) == 1 and argv[0] in ('-V', '--version'):
+        if '%(prog)' in version:
+            version = version % {'prog': os.path.basename(sys.argv[0])}
+        print(version)
+        sys.exit(0)
+
+
+def command(
+    name: str | None = None,
+    help: str | None = None  # pylint: disable=redefined-builtin
+) -> typing.Callable[[CommandFunc], CommandFunc]:
+    """Decorator to settle a command's name and help where it is defined.
+
+    register_command() will use these values instead of deriving them from
+    the function.  Arguments passed directly to register_command() still
+    take precedence.
+
+    @app.command(help='Do the cool thing.')
+    def cool_command(args: argparse.Namespace) -> int:
+        ...
+
+    Args:
+      name: The name of the command.  Defaults to the name of the function,
+        with underscores turned into minus symbols.
+      help: The summary shown in the list of commands.  Defaults to the first
+        paragraph of the docstring.
+    """
+
+    def decorator(func: CommandFunc) -> CommandFunc:
+        setattr(
+            func, '_mundane_name', name or func.__name__.replace('_', '-')
+        )
+        setattr(func, '_mundane_help', help)
+        return func
+
+    return decorator
+
+
 class ArgparseApp:
     """Facilitate creating an argparse based application.
 
@@ -254,7 +336,12 @@ class ArgparseApp:
         self._shared_parsers: dict[str, argparse.ArgumentParser] = dict()
         self._after_parse_hooks: list[NamespaceHook] = list()
 
+        # Nothing here, nor in the global/shared flag registration, should
+        # touch self.subparser.  Applications without commands then never pay
+        # for add_subparsers().
+
         if use_log_mgr:
+            from mundane import log_mgr  # pylint: disable=import-outside-toplevel
             log_mgr.activate(self.appname, self.dirs.user_log_dir)
             self.register_global_flags([log_mgr])
 
@@ -275,7 +362,12 @@ class ArgparseApp:
 
     @functools.cached_property
     def subparser(self) -> SubParser:
-        """The top-level command subparser for this class."""
+        """The top-level command subparser for this class.
+
+        It is created on first use, typically by register_command().
+        Applications without commands should not touch it, and instead use
+        parser.set_defaults(func=...).
+        """
         return self.new_subparser(self._parser)
 
     @property
@@ -294,11 +386,13 @@ class ArgparseApp:
 
         Used internally when formatting help.
         """
+        import shutil  # pylint: disable=import-outside-toplevel
         return shutil.get_terminal_size().columns
 
     @functools.cached_property
     def dirs(self) -> platformdirs.api.PlatformDirsABC:
         """Accessor for a consistent PlatformsDirs."""
+        import platformdirs  # pylint: disable=import-outside-toplevel
         return platformdirs.PlatformDirs(appname=self.appname)
 
     def new_subparser(self, parser: argparse.ArgumentParser) -> SubParser:
@@ -341,12 +435,11 @@ class ArgparseApp:
         Returns:
             The parser, only if a new one is created.
         """
-        if name not in self._shared_parsers:
-            self._shared_parsers[name] = argparse.ArgumentParser(
-                add_help=False
-            )
-            return self._shared_parsers[name]
-        return None
+        if name in self._shared_parsers:
+            return None
+        parser = argparse.ArgumentParser(add_help=False)
+        self._shared_parsers[name] = parser
+        return parser
 
     def safe_new_shared_parser(self, name: str) -> argparse.ArgumentParser:
         """Register and return a new parser it does not already exist.
@@ -439,7 +532,8 @@ class ArgparseApp:
         of the function and help text extracted from the function's docstring.
 
         Underscores in the function name are turned into a minus symbol for
-        easier use on the command line.
+        easier use on the command line.  A name or help set by the command()
+        decorator is used instead, if present.
 
         A new parser is returned and the function may then add flags using the
         standard add_argument() method.
@@ -468,19 +562,24 @@ class ArgparseApp:
         """
         if subparser is None:
             subparser = self.subparser
+        if not name:
+            name = getattr(func, '_mundane_name', None)
         if not name:
             name = func.__name__.replace('_', '-')
 
         docstring = Docstring(func, self.width)
-
-        parser_args = {
-            'formatter_class': argparse.RawDescriptionHelpFormatter,
-            'help': docstring.summary,
-            'description': docstring.description,
-        }
-        parser_args.update(kwargs)
-
-        parser = subparser.add_parser(name, **parser_args)
+        summary = getattr(func, '_mundane_help', None)
+        if summary is None:
+            summary = docstring.summary
+
+        parser = subparser.add_parser(
+            name, **{
+                **_COMMAND_PARSER_ARGS,
+                'help': summary,
+                'description': docstring.description,
+                **kwargs,
+            }
+        )
         if usage_only:
             parser.set_defaults(func=lambda x, y=parser: _usage(x, y))
         else:
@@ -488,12 +587,28 @@ class ArgparseApp:
 
         return parser
 
+    def register_all(self, modules: typing.Iterable[types.ModuleType]):
+        """Register global flags, shared flags, and commands in one call.
+
+        Equivalent to calling register_global_flags(), register_shared_flags()
+        and register_commands(), in that order, with the same modules.
+
+        Args:
+            modules: The modules to process.
+        """
+        modules = tuple(modules)
+        self.register_global_flags(modules)
+        self.register_shared_flags(modules)
+        self.register_commands(modules)
+
     def _register_module_via_hooks(
         self, hook_name: str, modules: typing.Iterable[types.ModuleType]
     ):
         """Implements processing of modules to maybe execute a hook."""
         for module in modules:
-            register_func = getattr(module, hook_name, None)
+            # Most modules only implement some hooks, and a missing getattr()
+            # is slow; go straight to the namespace instead.
+            register_func = vars(module).get(hook_name)
             if register_func:
                 register_func(self)
 
@@ -573,18 +688,27 @@ class ArgparseApp:
         for hook in self._after_parse_hooks:
             hook(args)
 
-        ret = os.EX_USAGE
-        if hasattr(args, 'func'):
-            logging.debug('Calling %s with %s', args.func, args)
-            ret = args.func(args)
+        func = getattr(args, 'func', None)
+        if func is None:
+            self.parser.print_help()
+            return os.EX_USAGE
+
+        logging.debug('Calling %s with %s', func, args)
+        ret = func(args)  # pylint: disable=not-callable
+
+        # Only needed after a command finishes, and only worth the
+        # syscall and formatting if anyone will see it.
+        if _log.isEnabledFor(logging.DEBUG):
+            import resource  # pylint: disable=import-outside-toplevel
+
+            import humanize  # pylint: disable=import-outside-toplevel
+
             logging.debug(
                 'Max memory used: %s',
                 humanize.naturalsize(
                     resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
                 )
             )
-            logging.debug('Finished. (%d)', ret or 0)
-        else:
-            self.parser.print_help()
+        logging.debug('Finished. (%d)', ret or 0)
 
         return ret
@@ -2,12 +2,16 @@
 # pylint: disable=too-many-lines
 
 import contextlib
-import io
+import functools
 import logging
 import os
+import subprocess
 import sys
 import textwrap
 import unittest
+from unittest import mock
+
+import platformdirs
 
 from mundane import app
 
@@ -15,7 +19,12 @@ from mundane.test_data import flags_one
 from mundane.test_data import flags_two
 from mundane.test_data import flags_three
 
+# Modules providing flags, and those additionally providing commands.
+_FLAG_MODULES = (flags_one, flags_two)
+_COMMAND_MODULES = (flags_one, flags_two, flags_three)
+
 
+@functools.cache
 def munge_expected(old_s: str) -> str:
     """Modify a multiple line string in a standard way.
 
@@ -25,43 +34,31 @@ def munge_expected(old_s: str) -> str:
     return textwrap.dedent(old_s).lstrip()
 
 
-class DocstringTest(unittest.TestCase):
-
-    def test_summary_only(self):
-        """This is a simple method."""
-
-        doc = app.Docstring(self.test_summary_only, 80)
-
-        self.assertEqual(doc.summary, 'This is a simple method.')
-        self.assertEqual(doc.description, 'This is a simple method.')
-
-    def test_no_docstring(self):
-        doc = app.Docstring(self.test_no_docstring, 80)
-
-        self.assertEqual(doc.summary, '')
-        self.assertEqual(doc.description, '')
-
-    def test_docstring(self):
-        """Lorem ipsum dolor sit amet, consectetur adipiscing elit.
-
-        Nam non ornare ex, sit amet aliquet urna.  Mauris a fringilla
-        justo.  Mauris eget mi arcu.  Mauris pretium faucibus purus eget
-        consequat.
-
-        Quisque et luctus lacus.  Mauris volutpat lacinia dignissim.  Cras
-        cursus aliquam lacus a ultrices.  Proin nec nisi tristique, rutrum
-        erat ac, rhoncus sapien.  Morbi vel eros ac est commodo
-        malesuada.  Phasellus cursus porta ligula quis suscipit.  Maecenas
-        at turpis neque.  Ut ipsum neque, eleifend hendrerit massa fringilla,
-        tincidunt rutrum nisi.
-
-        Integer tristique tortor et eros dictum pellentesque.
-        """
-
-    def test_long_normal_width(self):
-        doc = app.Docstring(self.test_docstring, 80)
-
-        expected_description = (
+# Command listing for an app with every test_data module registered.
+_COMMANDS_BLOCK = munge_expected(
+    """
+    Commands:
+      For more details: {prog} <command> --help
+
+      <command>            <command description>
+        generate-report
+        put-on-hat
+        remove-shoes       Shoes have custom help.
+        ingest-new-material
+                           Take in new material.
+        process            Process random data.
+        dance              Like no one is watching.
+        sub                A subcommand for wrapping other
+                           subcommands.
+    """
+)
+
+# Expected reflows of DocstringTest.test_docstring's docstring, as
+# (width, summary, description lines).
+_LOREM_SUMMARY = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.'
+_DOCSTRING_WIDTH_CASES = (
+    (
+        80, _LOREM_SUMMARY, (
             'Lorem ipsum dolor sit amet, consectetur adipiscing elit.',
             '',
             'Nam non ornare ex, sit amet aliquet urna.  Mauris a fringilla'
@@ -80,16 +77,9 @@ class DocstringTest(unittest.TestCase):
             '',
             'Integer tristique tortor et eros dictum pellentesque.',
         )
-        self.assertEqual(
-            doc.summary,
-            'Lorem ipsum dolor sit amet, consectetur adipiscing elit.'
-        )
-        self.assertEqual(doc.description, '\n'.join(expected_description))
-
-    def test_full_wide_width(self):
-        doc = app.Docstring(self.test_docstring, 150)
-
-        expected_description = (
+    ),
+    (
+        150, _LOREM_SUMMARY, (
             'Lorem ipsum dolor sit amet, consectetur adipiscing elit.',
             '',
             'Nam non ornare ex, sit amet aliquet urna.  Mauris a fringilla'
@@ -106,16 +96,9 @@ class DocstringTest(unittest.TestCase):
             '',
             'Integer tristique tortor et eros dictum pellentesque.',
         )
-        self.assertEqual(
-            doc.summary,
-            'Lorem ipsum dolor sit amet, consectetur adipiscing elit.'
-        )
-        self.assertEqual(doc.description, '\n'.join(expected_description))
-
-    def test_full_narrow_width(self):
-        doc = app.Docstring(self.test_docstring, 40)
-
-        expected_description = (
+    ),
+    (
+        40, 'Lorem ipsum dolor sit amet, consectetur\nadipiscing elit.', (
             'Lorem ipsum dolor sit amet, consectetur',
             'adipiscing elit.',
             '',
@@ -138,11 +121,93 @@ class DocstringTest(unittest.TestCase):
             'Integer tristique tortor et eros dictum',
             'pellentesque.',
         )
-        self.assertEqual(doc.description, '\n'.join(expected_description))
-        self.assertEqual(
-            doc.summary,
-            'Lorem ipsum dolor sit amet, consectetur\nadipiscing elit.'
-        )
+    ),
+)
+
+# put-on-hat arguments, with the expected xyzzy and keep values.
+_PUT_ON_HAT_CASES = (
+    (['--xyzzy', 'foo'], 'foo', None),
+    (['--xyzzy', 'bar', '-k'], 'bar', True),
+    (['--xyzzy', 'bar', '--no-keep'], 'bar', False),
+)
+
+
+class _Sink:
+    """A write-only stand-in for io.StringIO when capturing output."""
+
+    __slots__ = ('_parts',)
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+
+    def write(self, text: str) -> int:
+        """Collect text."""
+        self._parts.append(text)
+        return len(text)
+
+    def flush(self):
+        """Nothing is buffered."""
+
+    def getvalue(self) -> str:
+        """Everything written so far."""
+        return ''.join(self._parts)
+
+    def clear(self):
+        """Discard everything written so far."""
+        self._parts.clear()
+
+
+class DocstringTest(unittest.TestCase):
+
+    def test_summary_only(self):
+        """This is a simple method."""
+
+        doc = app.Docstring(self.test_summary_only, 80)
+
+        self.assertEqual(doc.summary, 'This is a simple method.')
+        self.assertEqual(doc.description, 'This is a simple method.')
+
+    def test_no_docstring(self):
+        doc = app.Docstring(self.test_no_docstring, 80)
+
+        self.assertEqual(doc.summary, '')
+        self.assertEqual(doc.description, '')
+
+    def test_docstring(self):
+        """Lorem ipsum dolor sit amet, consectetur adipiscing elit.
+
+        Nam non ornare ex, sit amet aliquet urna.  Mauris a fringilla
+        justo.  Mauris eget mi arcu.  Mauris pretium faucibus purus eget
+        consequat.
+
+        Quisque et luctus lacus.  Mauris volutpat lacinia dignissim.  Cras
+        cursus aliquam lacus a ultrices.  Proin nec nisi tristique, rutrum
+        erat ac, rhoncus sapien.  Morbi vel eros ac est commodo
+        malesuada.  Phasellus cursus porta ligula quis suscipit.  Maecenas
+        at turpis neque.  Ut ipsum neque, eleifend hendrerit massa fringilla,
+        tincidunt rutrum nisi.
+
+        Integer tristique tortor et eros dictum pellentesque.
+        """
+
+    def test_widths(self):
+        for width, summary, description in _DOCSTRING_WIDTH_CASES:
+            with self.subTest(width=width):
+                doc = app.Docstring(self.test_docstring, width)
+
+                self.assertEqual(doc.summary, summary)
+                self.assertEqual(doc.description, '\n'.join(description))
+
+    def test_changed_docstring(self):
+
+        def func():
+            """Old."""
+
+        self.assertEqual(app.Docstring(func, 80).summary, 'Old.')
+
+        func.__doc__ = 'New.'
+
+        self.assertEqual(app.Docstring(func, 80).summary, 'New.')
 
     def test_missing_blank_line_after_summary(self):
         """This is my summary.
@@ -215,58 +280,125 @@ class DocstringTest(unittest.TestCase):
         self.assertEqual(doc.description, '\n'.join(expected_description))
 
 
+class ImportTest(unittest.TestCase):
+
+    def test_heavy_imports_deferred(self):
+        # A fresh interpreter is the only reliable way to see what importing
+        # the module drags in.
+        deferred = (
+            'humanize', 'inspect', 'platformdirs', 'psutil', 'resource'
+        )
+        code = '; '.join(
+            (
+                'import sys',
+                'from mundane import app',
+                f'print(*(m for m in {deferred!r} if m in sys.modules))',
+            )
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            capture_output=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(app.__file__)),
+            text=True
+        )
+
+        self.assertEqual(result.stdout, '\n')
+        self.assertEqual(result.stderr, '')
+
+
 class BaseApp(unittest.TestCase):
     """Handle cases common to mucking around with a singleton."""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.prep_tty_vars()
+
+        # Emptied before each test rather than reallocated.
+        cls.stdout = _Sink()
+        cls.stderr = _Sink()
+
     def setUp(self):
         self.maxDiff = None  # pylint: disable=invalid-name
 
-        # Ensure at least one handler exists to save/restore
-        logging.debug(self.id())
-
-        self.mee = self.id().split('.')[-1]
-        self.prep_tty_vars()
-        self.prep_logger_handlers()
+        self.mee = self.id().rpartition('.')[2]
         self.prep_sys_argv()
 
-        self.stdout = io.StringIO()
-        self.stderr = io.StringIO()
+        self.stdout.clear()
+        self.stderr.clear()
 
-    def prep_tty_vars(self):
+    @classmethod
+    def prep_tty_vars(cls):
         """Explicitly control line wrapping of help.
 
         By keeping columns fairly narrow, it makes writing tests fit < 80
-        chars.
+        chars.  Set once per class; tests needing other values should patch
+        over it themselves.
         """
-        os.environ['COLUMNS'] = '61'
-        os.environ['ROWS'] = '24'
+        cls.enterClassContext(
+            mock.patch.dict(os.environ, COLUMNS='61', ROWS='24')
+        )
 
-    def prep_logger_handlers(self):
-        """Restore known logging handlers after each test."""
-        root_logger = logging.getLogger()
-        orig_handlers = root_logger.handlers.copy()
+    @classmethod
+    def prep_logger_handlers(cls):
+        """Snapshot the root logging handlers once for the class.
 
-        def restore_orig_handlers():
-            for hdlr in root_logger.handlers:
-                if hdlr not in orig_handlers:
-                    root_logger.removeHandler(hdlr)
-                    hdlr.close()
-            for hdlr in orig_handlers:
-                if hdlr not in root_logger.handlers:
-                    root_logger.addHandler(hdlr)
+        Only needed by tests that add handlers to the root logger.  Pair with
+        restore_logger_handlers() as a per-test cleanup.
+        """
+        # Ensure at least one handler exists to save/restore
+        logging.debug(cls.__qualname__)
 
-        self.addCleanup(restore_orig_handlers)
+        cls.orig_handlers = tuple(logging.getLogger().handlers)
+
+    def restore_logger_handlers(self):
+        """Put the root logging handlers back as prep_logger_handlers() saw."""
+        root_logger = logging.getLogger()
+        for hdlr in set(root_logger.handlers).difference(self.orig_handlers):
+            hdlr.close()
+        root_logger.handlers = list(self.orig_handlers)
 
     def prep_sys_argv(self):
         """Set sys_argv[0] to something knowable to assist testing."""
-        orig_sys_argv0 = sys.argv[0]
+        self.enterContext(
+            mock.patch.object(sys, 'argv', [self.mee, *sys.argv[1:]])
+        )
 
-        def restore_sys_argv0():
-            sys.argv[0] = orig_sys_argv0
+    @contextlib.contextmanager
+    def capture(self):
+        """Capture stdout/stderr into self.stdout/self.stderr."""
+        # Swap both streams in one go rather than stacking redirect_stdout()
+        # and redirect_stderr().
+        orig_streams = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+        try:
+            yield
+        finally:
+            sys.stdout, sys.stderr = orig_streams
+
+    @contextlib.contextmanager
+    def capture_exit(self):
+        """Capture stdout/stderr around code that must raise SystemExit.
+
+        Yields the assertRaises() context, so result.exception.code is
+        available afterwards.
+        """
+        with self.assertRaises(SystemExit) as result, self.capture():
+            yield result
 
-        sys.argv[0] = self.mee
+    def assert_exit(self, result, code, stdout='', stderr=''):
+        """Check the exit code and output from a capture_exit() block."""
+        self.assertEqual(self.stdout.getvalue(), stdout)
+        self.assertEqual(self.stderr.getvalue(), stderr)
+        self.assertEqual(result.exception.code, code)
 
-        self.addCleanup(restore_sys_argv0)
+    def assert_namespace(self, args, **expected):
+        """Check that args has exactly the expected attributes and values."""
+        self.assertCountEqual(vars(args), expected)
+        for key, value in expected.items():
+            self.assertEqual(getattr(args, key), value, key)
 
     def test_noop(self):
         # This triggers certain code paths in clean up so they do not bitrot.
@@ -292,6 +424,11 @@ class ArgparseAppPropertiesTest(BaseApp):
         self.assertIsInstance(self.my_app.subparser, app.SubParser)
         self.assertIs(self.my_app.subparser, self.my_app.subparser)
 
+    def test_extra_attributes(self):
+        self.my_app.db = self.mee
+
+        self.assertEqual(self.my_app.db, 'test_extra_attributes')
+
     def test_global_flags(self):
         self.assertIsInstance(
             self.my_app.global_flags,
@@ -301,13 +438,18 @@ class ArgparseAppPropertiesTest(BaseApp):
     def test_width(self):
         self.assertEqual(self.my_app.width, 61)
 
+    def test_width_override(self):
+        self.my_app.width = 100
+
+        self.assertEqual(self.my_app.width, 100)
+
     def test_dirs(self):
         self.assertIsInstance(
-            self.my_app.dirs, app.platformdirs.api.PlatformDirsABC
+            self.my_app.dirs, platformdirs.api.PlatformDirsABC
         )
         self.assertEqual(
             self.my_app.dirs.user_data_dir,
-            app.platformdirs.user_data_dir('test_dirs')
+            platformdirs.user_data_dir('test_dirs')
         )
 
 
@@ -319,19 +461,16 @@ class ArgparseAppParsingTest(BaseApp):
 
     def test_no_args(self):
 
-        with contextlib.redirect_stdout(
-                self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture():
             args = self.my_app.parser.parse_args([])
 
         self.assertEqual(self.stdout.getvalue(), '')
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(vars(args), {})
+        self.assert_namespace(args)
 
     def test_dash_h(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -342,15 +481,11 @@ class ArgparseAppParsingTest(BaseApp):
               -h, --help
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_dash_dash_help(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['--help'])
 
         expected = munge_expected(
@@ -361,15 +496,11 @@ class ArgparseAppParsingTest(BaseApp):
               -h, --help
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_unknown_arg(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['-k'])
 
         expected = munge_expected(
@@ -378,9 +509,7 @@ class ArgparseAppParsingTest(BaseApp):
             test_unknown_arg: error: unrecognized arguments: -k
             """
         )
-        self.assertEqual(self.stdout.getvalue(), '')
-        self.assertEqual(self.stderr.getvalue(), expected)
-        self.assertEqual(result.exception.code, 2)
+        self.assert_exit(result, 2, stderr=expected)
 
 
 class ArgparseAppCustomizationsTest(BaseApp):
@@ -390,9 +519,7 @@ class ArgparseAppCustomizationsTest(BaseApp):
         epilog = 'This is an epilog.'
         my_app = app.ArgparseApp(description=description, epilog=epilog)
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -407,22 +534,33 @@ class ArgparseAppCustomizationsTest(BaseApp):
             This is an epilog.
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
 
 class ArgparseAppParsingWithLogMgrTest(BaseApp):
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.prep_logger_handlers()
+
+    def setUp(self):
+        super().setUp()
+
+        self.addCleanup(self.restore_logger_handlers)
+
     def test_dash_h(self):
         log_levels = '{DEBUG,INFO,WARNING,ERROR,CRITICAL}'
-        log_dir = app.platformdirs.user_log_dir('test_dash_h')
-        os.environ['COLUMNS'] = f'{len(log_levels) + len(log_dir)}'
+        log_dir = platformdirs.user_log_dir('test_dash_h')
+        self.enterContext(
+            mock.patch.dict(
+                os.environ, COLUMNS=f'{len(log_levels) + len(log_dir)}'
+            )
+        )
         my_app = app.ArgparseApp(use_log_mgr=True)
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -438,9 +576,7 @@ class ArgparseAppParsingWithLogMgrTest(BaseApp):
                                     {log_dir})
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_activated(self):
         app.ArgparseApp(use_log_mgr=True)
@@ -462,7 +598,7 @@ class ArgparseAppWithDocstringTest(BaseApp):
     def setUp(self):
         super().setUp()
 
-        os.environ['COLUMNS'] = '50'
+        self.enterContext(mock.patch.dict(os.environ, COLUMNS='50'))
 
     def test_simple_docstring(self):
         """This is a simple docstring."""
@@ -471,9 +607,7 @@ class ArgparseAppWithDocstringTest(BaseApp):
             use_docstring_for_description=self.test_simple_docstring
         )
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -486,9 +620,7 @@ class ArgparseAppWithDocstringTest(BaseApp):
               -h, --help
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_longer_docstring(self):
         """Lorem ipsum dolor sit amet, consectetur adipiscing elit.
@@ -502,9 +634,7 @@ class ArgparseAppWithDocstringTest(BaseApp):
             use_docstring_for_description=self.test_longer_docstring
         )
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -522,16 +652,12 @@ class ArgparseAppWithDocstringTest(BaseApp):
               -h, --help
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_real_module(self):
         my_app = app.ArgparseApp(use_docstring_for_description=flags_one)
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -544,9 +670,7 @@ class ArgparseAppWithDocstringTest(BaseApp):
               -h, --help
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
 
 class ArgparseAppRegisterFlagsTest(BaseApp):
@@ -557,11 +681,9 @@ class ArgparseAppRegisterFlagsTest(BaseApp):
 
     def test_global_flags(self):
 
-        self.my_app.register_global_flags([flags_one, flags_two])
+        self.my_app.register_global_flags(_FLAG_MODULES)
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -573,15 +695,28 @@ class ArgparseAppRegisterFlagsTest(BaseApp):
               --foo       Enable foo-ing.
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_register_shared_flags(self):
-        self.my_app.register_shared_flags([flags_one, flags_two])
+        self.my_app.register_shared_flags(_FLAG_MODULES)
 
         self.assertIsNotNone(self.my_app.get_shared_parser('foo'))
 
+    def test_flags_do_not_create_subparser(self):
+        self.my_app.register_global_flags(_FLAG_MODULES)
+        self.my_app.register_shared_flags(_FLAG_MODULES)
+
+        self.assertIsNone(self.my_app.parser._subparsers)  # pylint: disable=protected-access
+
+    def test_register_all(self):
+        self.my_app.register_all(iter(_COMMAND_MODULES))
+
+        args = self.my_app.parser.parse_args(['--foo', 'dance'])
+
+        self.assertTrue(args.foo)
+        self.assertEqual(args.name, 'dance')
+        self.assertIsNotNone(self.my_app.get_shared_parser('foo'))
+
     def test_duplicate_shared_flags(self):
         self.assertIsNotNone(self.my_app.new_shared_parser(self.mee))
         self.assertIsNone(self.my_app.new_shared_parser(self.mee))
@@ -608,13 +743,11 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
         super().setUp()
 
         self.my_app = app.ArgparseApp()
-        self.my_app.register_shared_flags([flags_one, flags_two])
-        self.my_app.register_commands([flags_one, flags_two, flags_three])
+        self.my_app.register_shared_flags(_FLAG_MODULES)
+        self.my_app.register_commands(_COMMAND_MODULES)
 
     def test_dash_h_commands(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['-h'])
 
         expected = munge_expected(
@@ -624,30 +757,13 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
             Global flags:
               -h, --help
 
-            Commands:
-              For more details: test_dash_h_commands <command> --help
-
-              <command>            <command description>
-                generate-report
-                put-on-hat
-                remove-shoes       Shoes have custom help.
-                ingest-new-material
-                                   Take in new material.
-                process            Process random data.
-                dance              Like no one is watching.
-                sub                A subcommand for wrapping other
-                                   subcommands.
             """
-        )
+        ) + _COMMANDS_BLOCK.format(prog=self.mee)
 
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_generate_report_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['generate-report', '-h'])
 
         expected = munge_expected(
@@ -659,14 +775,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
             """
         )
 
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_put_on_hat_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['put-on-hat', '-h'])
 
         expected = munge_expected(
@@ -683,14 +795,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
             """
         )
 
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_remove_shoes_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['remove-shoes', '-h'])
 
         # Oops, implementer forgot to run through textwrap or equiv
@@ -706,14 +814,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               -h, --help  show this help message and exit
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_ingest_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['ingest-new-material', '-h'])
 
         expected = munge_expected(
@@ -735,14 +839,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
                                     Filename to ingest.
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_process_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['process', '-h'])
 
         expected = munge_expected(
@@ -755,14 +855,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               -h, --help  show this help message and exit
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_dance_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['dance', '-h'])
 
         expected = munge_expected(
@@ -780,14 +876,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               -n, --now, --no-now  Now or later. (default: False)
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_sub_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['sub', '-h'])
 
         expected = munge_expected(
@@ -809,14 +901,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
                 routine   A procedure to call.
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_sub_atomic_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['sub', 'atomic', '-h'])
 
         expected = munge_expected(
@@ -829,14 +917,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               -h, --help  show this help message and exit
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_sub_marine_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['sub', 'marine', '-h'])
 
         expected = munge_expected(
@@ -857,14 +941,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
                 fire        Fire a weapon.
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_sub_marine_change_depth_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(
                 ['sub', 'marine', 'change-depth', '-h']
             )
@@ -882,14 +962,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               --depth DEPTH  Cruising depth in meters. (default: 0)
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_sub_marine_fire_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['sub', 'marine', 'fire', '-h'])
 
         expected = munge_expected(
@@ -902,14 +978,10 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               -h, --help  show this help message and exit
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_sub_routine_dash_h(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.parser.parse_args(['sub', 'routine', '-h'])
 
         expected = munge_expected(
@@ -922,74 +994,154 @@ class ArgparseAppRegisterCommandsTest(BaseApp):
               -h, --help  show this help message and exit
             """
         )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assert_exit(result, 0, stdout=expected)
 
-    def test_put_on_hat_foo(self):
-        args = self.my_app.parser.parse_args(['put-on-hat', '--xyzzy', 'foo'])
 
-        self.assertEqual(
-            vars(args), {
-                'name': 'put-on-hat',
-                'func': flags_one.put_on_hat,
-                'xyzzy': 'foo',
-                'keep': None,
-            }
-        )
+class ArgparseAppCommandParsingTest(BaseApp):
+    """Parse command lines without rendering any help.
 
-    def test_put_on_hat_bar(self):
-        args = self.my_app.parser.parse_args(
-            ['put-on-hat', '--xyzzy', 'bar', '-k']
-        )
+    Nothing here depends on the program name, so one app serves the class.
+    """
 
-        self.assertEqual(
-            vars(args), {
-                'name': 'put-on-hat',
-                'func': flags_one.put_on_hat,
-                'xyzzy': 'bar',
-                'keep': True,
-            }
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.my_app = app.ArgparseApp()
+        cls.my_app.register_shared_flags(_FLAG_MODULES)
+        cls.my_app.register_commands(_COMMAND_MODULES)
+
+    def test_put_on_hat(self):
+        for argv, xyzzy, keep in _PUT_ON_HAT_CASES:
+            with self.subTest(argv=argv):
+                args = self.my_app.parser.parse_args(['put-on-hat', *argv])
+
+                self.assert_namespace(
+                    args,
+                    name='put-on-hat',
+                    func=flags_one.put_on_hat,
+                    xyzzy=xyzzy,
+                    keep=keep,
+                )
+
+    def test_dance(self):
+        args = self.my_app.parser.parse_args(['dance'])
+
+        self.assert_namespace(
+            args,
+            name='dance',
+            func=flags_two.dance,
+            now=False,
         )
 
-    def test_put_on_hat_bar_no_keep(self):
+    def test_sub_marine_change_depth(self):
         args = self.my_app.parser.parse_args(
-            ['put-on-hat', '--xyzzy', 'bar', '--no-keep']
+            ['sub', 'marine', 'change-depth', '--rate', '10']
         )
 
-        self.assertEqual(
-            vars(args), {
-                'name': 'put-on-hat',
-                'func': flags_one.put_on_hat,
-                'xyzzy': 'bar',
-                'keep': False,
-            }
+        self.assert_namespace(
+            args,
+            name='change-depth',
+            func=flags_three.change_depth,
+            rate=10,
+            depth=0,
         )
 
-    def test_dance(self):
-        args = self.my_app.parser.parse_args(['dance'])
 
-        self.assertEqual(
-            vars(args), {
-                'name': 'dance',
-                'func': flags_two.dance,
-                'now': False
-            }
+class CommandDecoratorTest(BaseApp):
+
+    def setUp(self):
+        super().setUp()
+
+        self.my_app = app.ArgparseApp()
+
+    def test_defaults(self):
+
+        @app.command()
+        def do_thing(args):  # pragma: no cover
+            """Docstring summary."""
+            del args
+            return 0
+
+        self.my_app.register_command(do_thing)
+
+        with self.capture_exit() as result:
+            self.my_app.parser.parse_args(['-h'])
+
+        expected = munge_expected(
+            """
+            usage: test_defaults [-h] <command> ...
+
+            Global flags:
+              -h, --help
+
+            Commands:
+              For more details: test_defaults <command> --help
+
+              <command>   <command description>
+                do-thing  Docstring summary.
+            """
         )
+        self.assert_exit(result, 0, stdout=expected)
 
-    def test_sub_marine_change_depth(self):
-        args = self.my_app.parser.parse_args(
-            ['sub', 'marine', 'change-depth', '--rate', '10']
+    def test_name_and_help(self):
+
+        @app.command(name='thing', help='Decorated help.')
+        def do_thing(args):
+            """Docstring summary."""
+            del args
+            return 42
+
+        self.my_app.register_command(do_thing)
+
+        with self.capture_exit() as result:
+            self.my_app.parser.parse_args(['-h'])
+
+        expected = munge_expected(
+            """
+            usage: test_name_and_help [-h] <command> ...
+
+            Global flags:
+              -h, --help
+
+            Commands:
+              For more details: test_name_and_help <command> --help
+
+              <command>   <command description>
+                thing     Decorated help.
+            """
         )
+        self.assert_exit(result, 0, stdout=expected)
+        self.assertEqual(self.my_app.run(['thing']), 42)
 
-        self.assertEqual(
-            vars(args), {
-                'name': 'change-depth',
-                'func': flags_three.change_depth,
-                'rate': 10,
-                'depth': 0,
-            }
+    def test_register_command_args_win(self):
+
+        @app.command(name='thing', help='Decorated help.')
+        def do_thing(args):  # pragma: no cover
+            """Docstring summary."""
+            del args
+            return 0
+
+        self.my_app.register_command(do_thing, name='other', help='Mine.')
+
+        with self.capture_exit() as result:
+            self.my_app.parser.parse_args(['-h'])
+
+        expected = munge_expected(
+            """
+            usage: test_register_command_args_win [-h] <command> ...
+
+            Global flags:
+              -h, --help
+
+            Commands:
+              For more details: test_register_command_args_win <command> --help
+
+              <command>   <command description>
+                other     Mine.
+            """
         )
+        self.assert_exit(result, 0, stdout=expected)
 
 
 class ArgparseAppRunCommandTest(BaseApp):
@@ -998,13 +1150,12 @@ class ArgparseAppRunCommandTest(BaseApp):
         super().setUp()
 
         self.my_app = app.ArgparseApp()
-        self.my_app.register_global_flags([flags_one, flags_two])
-        self.my_app.register_shared_flags([flags_one, flags_two])
-        self.my_app.register_commands([flags_one, flags_two, flags_three])
+        self.my_app.register_global_flags(_FLAG_MODULES)
+        self.my_app.register_shared_flags(_FLAG_MODULES)
+        self.my_app.register_commands(_COMMAND_MODULES)
 
     def test_no_command_with_defaults(self):
-        with contextlib.redirect_stdout(
-                self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture():
             retcode = self.my_app.run([])
 
         expected = munge_expected(
@@ -1016,21 +1167,8 @@ class ArgparseAppRunCommandTest(BaseApp):
               -h, --help
               --foo                Enable foo-ing.
 
-            Commands:
-              For more details: test_no_command_with_defaults <command> --help
-
-              <command>            <command description>
-                generate-report
-                put-on-hat
-                remove-shoes       Shoes have custom help.
-                ingest-new-material
-                                   Take in new material.
-                process            Process random data.
-                dance              Like no one is watching.
-                sub                A subcommand for wrapping other
-                                   subcommands.
             """
-        )
+        ) + _COMMANDS_BLOCK.format(prog=self.mee)
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
         self.assertEqual(retcode, os.EX_USAGE)
@@ -1044,8 +1182,7 @@ class ArgparseAppRunCommandTest(BaseApp):
 
         self.my_app.parser.set_defaults(func=fallback)
 
-        with contextlib.redirect_stdout(
-                self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture():
             retcode = self.my_app.run([])
 
         self.assertEqual(self.stdout.getvalue(), 'fallback was called\n')
@@ -1061,9 +1198,7 @@ class ArgparseAppRunCommandTest(BaseApp):
 
         self.my_app.parser.set_defaults(func=fallback)
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
+        with self.capture_exit() as result:
             self.my_app.run(['-h'])
 
         expected = munge_expected(
@@ -1074,31 +1209,14 @@ class ArgparseAppRunCommandTest(BaseApp):
               -h, --help
               --foo                Enable foo-ing.
 
-            Commands:
-              For more details: test_fallback_with_dash_h <command> --help
-
-              <command>            <command description>
-                generate-report
-                put-on-hat
-                remove-shoes       Shoes have custom help.
-                ingest-new-material
-                                   Take in new material.
-                process            Process random data.
-                dance              Like no one is watching.
-                sub                A subcommand for wrapping other
-                                   subcommands.
             """
-        )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        ) + _COMMANDS_BLOCK.format(prog=self.mee)
+        self.assert_exit(result, 0, stdout=expected)
 
     def test_bogus_command_with_defaults(self):
         bogus = 'bogus-command'
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run([bogus]))
+        with self.capture_exit() as result:
+            self.my_app.run([bogus])
 
         cmd = '<command>'
         choices = "', '".join(
@@ -1115,9 +1233,7 @@ class ArgparseAppRunCommandTest(BaseApp):
             {self.mee}: error: argument {cmd}: invalid choice: '{bogus}' {choose}
             """
         )
-        self.assertEqual(self.stdout.getvalue(), '')
-        self.assertEqual(self.stderr.getvalue(), expected)
-        self.assertEqual(result.exception.code, 2)
+        self.assert_exit(result, 2, stderr=expected)
 
     def test_bogus_command_with_fallback(self):
 
@@ -1128,10 +1244,8 @@ class ArgparseAppRunCommandTest(BaseApp):
 
         self.my_app.parser.set_defaults(func=fallback)
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['bogosity']))
+        with self.capture_exit() as result:
+            self.my_app.run(['bogosity'])
 
         cmd = '<command>'
         choices = "', '".join(
@@ -1148,28 +1262,65 @@ class ArgparseAppRunCommandTest(BaseApp):
             {self.mee}: error: argument {cmd}: invalid choice: 'bogosity' {choose}
             """
         )
-        self.assertEqual(self.stdout.getvalue(), '')
-        self.assertEqual(self.stderr.getvalue(), expected)
-        self.assertEqual(result.exception.code, 2)
+        self.assert_exit(result, 2, stderr=expected)
+
+    def test_sub(self):
+        with self.capture():
+            ret = self.my_app.run(['sub'])
+
+        expected = munge_expected(
+            """
+            usage: test_sub sub [-h] <command> ...
+
+            A subcommand for wrapping other subcommands.
+
+            options:
+              -h, --help  show this help message and exit
+
+            Commands:
+              For more details: test_sub sub <command> --help
+
+              <command>   <command description>
+                atomic    A small feature.
+                class     Deriving from a super.
+                marine    A boat that can do interesting things.
+                routine   A procedure to call.
+            """
+        )
+        self.assertEqual(self.stdout.getvalue(), expected)
+        self.assertEqual(self.stderr.getvalue(), '')
+        self.assertEqual(ret, os.EX_USAGE)
+
+
+class ArgparseAppRunCommandOutputTest(BaseApp):
+    """Run commands whose output does not depend on the program name.
+
+    Running a command does not change the app, so one serves the class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.my_app = app.ArgparseApp()
+        cls.my_app.register_global_flags(_FLAG_MODULES)
+        cls.my_app.register_shared_flags(_FLAG_MODULES)
+        cls.my_app.register_commands(_COMMAND_MODULES)
 
     def test_generate_report(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['generate-report']))
+        with self.capture():
+            ret = self.my_app.run(['generate-report'])
 
         expected = 'generating report using generate-report\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, None)
+        self.assertIsNone(ret)
 
     def test_remove_shoes(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['remove-shoes']))
+        with self.capture():
+            ret = self.my_app.run(['remove-shoes'])
 
         expected = munge_expected(
             """
@@ -1179,14 +1330,12 @@ class ArgparseAppRunCommandTest(BaseApp):
         )
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 3)
+        self.assertEqual(ret, 3)
 
     def test_remove_shoes_with_foo(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run('--foo remove-shoes'.split()))
+        with self.capture():
+            ret = self.my_app.run('--foo remove-shoes'.split())
 
         expected = munge_expected(
             """
@@ -1196,131 +1345,161 @@ class ArgparseAppRunCommandTest(BaseApp):
         )
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 3)
+        self.assertEqual(ret, 3)
 
     def test_ingest_new_material(self):
 
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['ingest-new-material', '-f', 'blah']))
+        with self.capture():
+            ret = self.my_app.run(['ingest-new-material', '-f', 'blah'])
 
         expected = 'ingesting material from blah\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 5)
+        self.assertEqual(ret, 5)
 
     def test_process(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['process']))
+        with self.capture():
+            ret = self.my_app.run(['process'])
 
-        self.assertEqual(result.exception.code, 1)
+        self.assertEqual(ret, 1)
 
     def test_dance(self):
         with self.assertRaisesRegex(RuntimeError,
                                     'generic exception handling'):
-            sys.exit(self.my_app.run(['dance']))
+            self.my_app.run(['dance'])
 
     def test_dance_now(self):
         with self.assertRaisesRegex(AttributeError, 'issue #18'):
-            sys.exit(self.my_app.run(['dance', '--now']))
-
-    def test_sub(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['sub']))
-
-        expected = munge_expected(
-            """
-            usage: test_sub sub [-h] <command> ...
-
-            A subcommand for wrapping other subcommands.
-
-            options:
-              -h, --help  show this help message and exit
-
-            Commands:
-              For more details: test_sub sub <command> --help
-
-              <command>   <command description>
-                atomic    A small feature.
-                class     Deriving from a super.
-                marine    A boat that can do interesting things.
-                routine   A procedure to call.
-            """
-        )
-        self.assertEqual(self.stdout.getvalue(), expected)
-        self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, os.EX_USAGE)
+            self.my_app.run(['dance', '--now'])
 
     def test_sub_atomic(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['sub', 'atomic']))
+        with self.capture():
+            ret = self.my_app.run(['sub', 'atomic'])
         expected = 'I am a particle that makes up elements.\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assertEqual(ret, 0)
 
     def test_sub_class(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['sub', 'class']))
+        with self.capture():
+            ret = self.my_app.run(['sub', 'class'])
         expected = 'Derivation achieved.\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assertEqual(ret, 0)
 
     def test_sub_marine(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run(['sub', 'marine']))
+        with self.capture():
+            ret = self.my_app.run(['sub', 'marine'])
         expected = 'This boat can go underwater and fire weapons.\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assertEqual(ret, 0)
 
     def test_sub_marine_change_depth(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(
-                self.my_app.run(
-                    'sub marine change-depth --depth 50 --rate 3'.split()
-                )
+        with self.capture():
+            ret = self.my_app.run(
+                'sub marine change-depth --depth 50 --rate 3'.split()
             )
         expected = 'The boat will go to a depth of 50 meters at 3 m/s.\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assertEqual(ret, 0)
 
     def test_sub_marine_fire(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run('--foo sub marine fire'.split()))
+        with self.capture():
+            ret = self.my_app.run('--foo sub marine fire'.split())
 
         expected = 'Torpedoes away!  Also, args.foo=True.\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assertEqual(ret, 0)
 
     def test_sub_routine(self):
-        with self.assertRaises(
-                SystemExit) as result, contextlib.redirect_stdout(
-                    self.stdout), contextlib.redirect_stderr(self.stderr):
-            sys.exit(self.my_app.run('sub routine'.split()))
+        with self.capture():
+            ret = self.my_app.run('sub routine'.split())
 
         expected = 'A sub routine was called.\n'
         self.assertEqual(self.stdout.getvalue(), expected)
         self.assertEqual(self.stderr.getvalue(), '')
-        self.assertEqual(result.exception.code, 0)
+        self.assertEqual(ret, 0)
+
+
+class ArgparseAppRunLoggingTest(BaseApp):
+
+    def setUp(self):
+        super().setUp()
+
+        self.my_app = app.ArgparseApp()
+        self.my_app.register_commands([flags_three])
+
+    def test_memory_logged_when_debugging(self):
+        with self.assertLogs(level=logging.DEBUG) as logs:
+            with self.capture():
+                self.my_app.run(['sub', 'routine'])
+
+        for msg in ('Calling', 'Max memory used', 'Finished. (0)'):
+            self.assertTrue(any(msg in line for line in logs.output), msg)
+
+    def test_memory_not_measured_unless_debugging(self):
+        with mock.patch('resource.getrusage') as getrusage:
+            with self.assertLogs(level=logging.INFO):
+                with self.capture():
+                    logging.info('keep assertLogs happy')
+                    self.my_app.run(['sub', 'routine'])
+
+        getrusage.assert_not_called()
+
+    def test_root_handler_installed(self):
+        # Apps not using log_mgr rely on logging.debug() in run() to set up a
+        # default handler.
+        root_logger = logging.getLogger()
+        self.enterContext(mock.patch.object(root_logger, 'handlers', []))
+
+        with self.capture():
+            self.my_app.run(['sub', 'routine'])
+
+        self.assertTrue(root_logger.handlers)
+
+
+class QuickVersionTest(BaseApp):
+
+    def test_no_args(self):
+        with self.capture():
+            app.quick_version('1.0', [])
+
+        self.assertEqual(self.stdout.getvalue(), '')
+        self.assertEqual(self.stderr.getvalue(), '')
+
+    def test_dash_cap_v(self):
+        with self.capture_exit() as result:
+            app.quick_version('1.0', ['-V'])
+
+        self.assert_exit(result, 0, stdout='1.0\n')
+
+    def test_dash_dash_version_with_prog(self):
+        with self.capture_exit() as result:
+            app.quick_version('%(prog)s 2.3', ['--version'])
+
+        self.assert_exit(result, 0, stdout=f'{self.mee} 2.3\n')
+
+    def test_version_with_other_args(self):
+        with self.capture():
+            app.quick_version('1.0', ['--foo', '--version'])
+            app.quick_version('1.0', ['info', '-V'])
+
+        self.assertEqual(self.stdout.getvalue(), '')
+        self.assertEqual(self.stderr.getvalue(), '')
+
+    def test_defaults_to_sys_argv(self):
+        self.enterContext(
+            mock.patch.object(sys, 'argv', [self.mee, '--version'])
+        )
+
+        with self.capture_exit() as result:
+            app.quick_version('1.0')
+
+        self.assert_exit(result, 0, stdout='1.0\n')
 
 
 if __name__ == '__main__':  # pragma: no cover
@@ -9,8 +9,11 @@ To use the global flag with ArgparseApp, register using:
 from __future__ import annotations
 
 import argparse
+import contextlib
 import datetime
+import functools
 import logging
+import os
 import pathlib
 import platform
 import typing
@@ -26,6 +29,16 @@ LOG_FORMAT = (
 )
 
 
+@functools.lru_cache(maxsize=1)
+def _username() -> str:
+    """Name of the user running this process.
+
+    This can mean a trip through NSS (LDAP and such), and it will not change
+    during the life of the process, so only look it up once.
+    """
+    return psutil.Process().username()
+
+
 class LogHandler(logging.FileHandler):
     """Logging handler that writes to a directory.
 
@@ -49,14 +62,12 @@ class LogHandler(logging.FileHandler):
     """
 
     def __init__(self, progname: str, output_dir: str):
-        process = psutil.Process()
-
         now = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
 
         self.short_filename = f'{progname}.log'
         self.long_filename = (
             f'{self.short_filename}.{platform.node()}'
-            f'.{process.username()}.{now}.{process.pid}'
+            f'.{_username()}.{now}.{os.getpid()}'
         )
         self.output_dir = output_dir
 
@@ -84,11 +95,20 @@ class LogHandler(logging.FileHandler):
         handle = super()._open()
 
         # best effort on symlink
+        #
+        # Build it off to the side, then rename it over the old one, so the
+        # convenience name never briefly disappears.
+        tmp_path = self.symlink_path.with_name(
+            f'{self.short_filename}.{os.getpid()}.tmp'
+        )
         try:
-            self.symlink_path.unlink(missing_ok=True)
-            self.symlink_path.symlink_to(self.baseFilename)
+            # A crash could leave one behind for a since reused pid.
+            tmp_path.unlink(missing_ok=True)
+            tmp_path.symlink_to(self.baseFilename)
+            tmp_path.replace(self.symlink_path)
         except OSError:
-            pass
+            with contextlib.suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
 
         return handle
 
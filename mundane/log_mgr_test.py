@@ -1,6 +1,7 @@
 """Tests for log_mgr.py"""
 
 import contextlib
+import functools
 import io
 import os
 import pathlib
@@ -8,6 +9,7 @@ import sys
 import tempfile
 import textwrap
 import unittest
+from unittest import mock
 
 from mundane import app
 from mundane import log_mgr
@@ -25,6 +27,7 @@ def setUpModule():
     tempfile.tempdir = tempfile.mkdtemp()
 
 
+@functools.cache
 def munge_expected(old_s: str) -> str:
     """Modify a multiple line string in a standard way.
 
@@ -37,32 +40,37 @@ def munge_expected(old_s: str) -> str:
 class BaseLogging(unittest.TestCase):
     """Handle cases common to mucking around with a singleton."""
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.prep_tty_vars()
+
     def setUp(self):
-        self.mee = self.id().split('.')[-1]
+        self.mee = self.id().rpartition('.')[2]
 
-        self.prep_tty_vars()
         self.prep_level_names()
         self.prep_logger_handlers()
         self.prep_sys_argv()
         self.prep_root_logging_level()
 
-    def prep_tty_vars(self):
+    @classmethod
+    def prep_tty_vars(cls):
         """Explicitly control line wrapping of help.
 
         By keeping columns fairly narrow, it makes writing tests fit < 80
-        chars.
+        chars.  Set once per class; tests needing other values should patch
+        over it themselves.
         """
-        os.environ['COLUMNS'] = '60'
-        os.environ['ROWS'] = '24'
+        cls.enterClassContext(
+            mock.patch.dict(os.environ, COLUMNS='60', ROWS='24')
+        )
 
     def prep_level_names(self):
         """Restore level names after each test."""
-        orig_levels = log_mgr.logging._levelToName.copy()  # pylint: disable=protected-access
-
-        def restore_orig_levels():
-            log_mgr.logging._levelToName = orig_levels.copy()  # pylint: disable=protected-access
-
-        self.addCleanup(restore_orig_levels)
+        self.enterContext(
+            mock.patch.dict(log_mgr.logging._levelToName)  # pylint: disable=protected-access
+        )
 
     def prep_logger_handlers(self):
         """Restore known logging handlers after each test."""
@@ -82,24 +90,14 @@ class BaseLogging(unittest.TestCase):
 
     def prep_sys_argv(self):
         """Set sys_argv[0] to something knowable to assist testing."""
-        orig_sys_argv0 = sys.argv[0]
-
-        def restore_sys_argv0():
-            sys.argv[0] = orig_sys_argv0
-
-        self.addCleanup(restore_sys_argv0)
-
-        sys.argv[0] = self.mee
+        self.enterContext(
+            mock.patch.object(sys, 'argv', [self.mee, *sys.argv[1:]])
+        )
 
     def prep_root_logging_level(self):
         """Restore root logging level after each test."""
         logger = log_mgr.logging.getLogger()
-        orig_level = logger.level
-
-        def restore_logger_level():
-            logger.level = orig_level
-
-        self.addCleanup(restore_logger_level)
+        self.enterContext(mock.patch.object(logger, 'level', logger.level))
 
     def test_noop(self):
         # This triggers certain code paths in clean up so they do not bitrot.
@@ -189,6 +187,21 @@ class LogHandlerTest(BaseLogging):
 
         self.assertTrue(self.handler.symlink_path.is_symlink())
 
+    def test_stale_temporary_symlink(self):
+        stale = self.handler.symlink_path.with_name(
+            f'{self.handler.short_filename}.{os.getpid()}.tmp'
+        )
+        stale.parent.mkdir(parents=True, exist_ok=True)
+        stale.symlink_to('nowhere')
+
+        self.logger.info('Logged from %s', self.id())
+
+        self.assertEqual(
+            self.handler.symlink_path.readlink(),
+            pathlib.Path(self.handler.baseFilename)
+        )
+        self.assertFalse(stale.is_symlink(), 'stale link consumed')
+
     def test_symlink_dst_is_directory(self):
         self.handler.symlink_path.mkdir()
         self.assertTrue(
@@ -198,6 +211,11 @@ class LogHandlerTest(BaseLogging):
         self.logger.info('Logged from %s', self.id())
 
         self.assertTrue(self.handler.symlink_path.is_dir(), 'still a dir')
+        self.assertEqual(
+            sorted(self.handler.symlink_path.parent.iterdir()),
+            sorted((self.handler.symlink_path, self.handler._base_path)),  # pylint: disable=protected-access
+            'no temporary symlink left behind'
+        )
 
     def test_output_dir_does_not_exist(self):
         out_dir = pathlib.Path(self.handler.output_dir)
@@ -379,7 +397,11 @@ class LogDirTest(BaseLogging):
         self.handler.output_dir = tempfile.mkdtemp()
 
         # Different length of tempdir can cause wrapping issues in help output
-        os.environ['COLUMNS'] = f'{40 + len(self.handler.output_dir)}'
+        self.enterContext(
+            mock.patch.dict(
+                os.environ, COLUMNS=f'{40 + len(self.handler.output_dir)}'
+            )
+        )
 
     def test_action_only(self):
         orig_out_dir = self.handler.output_dir
@@ -434,7 +456,11 @@ class LogDirTest(BaseLogging):
     def test_with_default_and_help(self):
         out_dir = f'/path/to/{self.id()}'
         help_msg = 'My usual dir help'
-        os.environ['COLUMNS'] = f'{30 + len(help_msg) + len(out_dir)}'
+        self.enterContext(
+            mock.patch.dict(
+                os.environ, COLUMNS=f'{30 + len(help_msg) + len(out_dir)}'
+            )
+        )
 
         self.parser.add_argument(
             '-d',